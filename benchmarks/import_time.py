@@ -0,0 +1,83 @@
+# LLao1/benchmarks/import_time.py
+"""
+Measures the cold import time of llao1 modules in fresh interpreters.
+
+Usage:
+    python benchmarks/import_time.py [--module llao1.core.reasoning] [--runs 5] [--budget-ms 150]
+
+Exits with status 1 if the median import time exceeds the budget or if any
+heavy optional dependency is imported eagerly.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["exa_py", "PIL", "numpy", "ollama", "httpx", "streamlit"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str) -> dict:
+    """
+    Imports a module in a fresh interpreter and reports its import time and eagerly loaded heavy modules.
+
+    Args:
+        module: The dotted module name to import.
+
+    Returns:
+        A dictionary with 'seconds' and 'loaded' keys.
+    """
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join([repo_root, os.environ.get("PYTHONPATH", "")]),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--module", default="llao1.core.reasoning")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    samples = [measure(args.module) for _ in range(args.runs)]
+    times_ms = [sample["seconds"] * 1000 for sample in samples]
+    loaded = sorted({name for sample in samples for name in sample["loaded"]})
+    median_ms = statistics.median(times_ms)
+
+    print(f"module:        {args.module}")
+    print(f"runs:          {args.runs}")
+    print(f"median:        {median_ms:.1f} ms")
+    print(f"min / max:     {min(times_ms):.1f} / {max(times_ms):.1f} ms")
+    print(f"budget:        {args.budget_ms:.1f} ms")
+    print(f"heavy modules: {', '.join(loaded) if loaded else 'none'}")
+
+    if loaded or median_ms > args.budget_ms:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+# LLao1/benchmarks/load_test.py
+"""
+Load-tests generate_reasoning_steps with simulated concurrent users against mock Ollama and Exa backends.
+
+Each concurrency level runs for a fixed duration. By default every simulated
+user runs a closed loop (query, think time, next query). With --arrival-rate,
+queries instead arrive as a Poisson process and are served by a pool sized to
+the concurrency level. The mock backends sleep for log-normally distributed
+latencies and model a limited number of parallel Ollama slots, so queueing
+shows up the way it would against a real server. code_executor still runs real
+subprocesses.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 1,2,4,8,16 --duration 30 --label v1
+    python benchmarks/load_test.py --arrival-rate 2 --latency-scale 0.1 --compare results/v1.json
+
+Results are printed as a table and saturation curve and written to
+<output-dir>/<label>.json and <label>.csv for comparison across releases.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import math
+import os
+import queue
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from typing import List, Dict, Any
+
+QUERIES = {
+    "text": [
+        "What is the square root of 256 plus the sine of pi/4?",
+        "Explain the difference between a process and a thread.",
+        "How many prime numbers are there below 100?",
+    ],
+    "image": [
+        "Describe what is in this image.",
+        "What colors dominate this image?",
+    ],
+    "tools": [
+        "Search for the latest news about autonomous vehicles and summarize the first result.",
+        "Find the population of France and compute it divided by 67.",
+    ],
+}
+
+SCRIPTS = {  # per query kind: the JSON steps the mock model returns, in order
+    "text": [
+        {"title": "Decompose the problem", "content": "Breaking the question down.", "next_action": "continue"},
+        {"title": "Work through the reasoning", "content": "Applying the relevant facts.", "next_action": "continue"},
+        {"title": "Verify the result", "content": "Checking with a second method.", "next_action": "final_answer"},
+    ],
+    "image": [
+        {"title": "Inspect the image", "content": "Looking at the main subjects.", "next_action": "continue"},
+        {"title": "Describe the image", "content": "Summarizing what is visible.", "next_action": "final_answer"},
+    ],
+    "tools": [
+        {"title": "Search the web", "content": "Searching.", "tool": "web_search", "tool_input": "autonomous vehicles", "num_results": 3, "next_action": "continue"},
+        {"title": "Read the top result", "content": "Fetching the page.", "tool": "fetch_page_content", "tool_input": ["doc-1"], "next_action": "continue"},
+        {"title": "Compute", "content": "Running code.", "tool": "code_executor", "tool_input": "print(sum(range(1000)))", "next_action": "continue"},
+        {"title": "Conclude", "content": "Combining the results.", "next_action": "final_answer"},
+    ],
+}
+
+_request_state = threading.local()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class MockBackend:
+    """Log-normal latency source with a bounded number of parallel slots, like a single Ollama server."""
+
+    def __init__(self, median: float, sigma: float, parallel: int, scale: float):
+        self.median = median
+        self.sigma = sigma
+        self.scale = scale
+        self._slots = threading.BoundedSemaphore(parallel)
+
+    def call(self, median: float = None):
+        wait_start = time.perf_counter()
+        with self._slots:
+            waited = time.perf_counter() - wait_start
+            _request_state.backend_wait = getattr(_request_state, "backend_wait", 0.0) + waited
+            time.sleep(random.lognormvariate(0, self.sigma) * (median or self.median) * self.scale)
+
+
+class TimedSlots:
+    """Wraps the code_executor sandbox semaphore so time spent waiting for a slot counts as queueing delay."""
+
+    def __init__(self, slots):
+        self._slots = slots
+
+    def __enter__(self):
+        wait_start = time.perf_counter()
+        self._slots.acquire()
+        waited = time.perf_counter() - wait_start
+        _request_state.sandbox_wait = getattr(_request_state, "sandbox_wait", 0.0) + waited
+        return self
+
+    def __exit__(self, *exc_info):
+        self._slots.release()
+        return False
+
+
+class MockOllamaClient:
+    """Stands in for ollama.Client, replaying SCRIPTS based on the query kind and the request's step counter."""
+
+    def __init__(self, backend: MockBackend, final_median: float):
+        self.backend = backend
+        self.final_median = final_median
+
+    def chat(self, model, messages, options=None, format=None, stream=False, keep_alive=None):
+        if format != "json":
+            self.backend.call(self.final_median)
+            return {"message": {"content": "Mock final answer."}, "load_duration": 0}
+        self.backend.call()
+        script = SCRIPTS[_request_state.kind]
+        step = _request_state.step
+        _request_state.step += 1
+        return {
+            "message": {"content": json.dumps(script[min(step, len(script) - 1)])},
+            "load_duration": 0,
+        }
+
+    def show(self, model):
+        return {}
+
+    def ps(self):
+        return {"models": []}
+
+    def generate(self, model, prompt="", keep_alive=None):
+        return {"load_duration": 0}
+
+
+class MockExaClient:
+    """Stands in for exa_py.Exa with fixed search results and long page bodies."""
+
+    def __init__(self, backend: MockBackend, page_chars: int):
+        self.backend = backend
+        self.page_text = ("Lorem ipsum dolor sit amet. " * (page_chars // 28 + 1))[:page_chars]
+
+    def search_and_contents(self, query, num_results=5, **kwargs):
+        self.backend.call()
+        results = [
+            SimpleNamespace(id=f"doc-{i + 1}", title=f"Result {i + 1} for {query}", text=self.page_text[:500], url=f"https://example.com/{i + 1}")
+            for i in range(num_results)
+        ]
+        return SimpleNamespace(results=results)
+
+    def get_contents(self, ids, text=True):
+        self.backend.call()
+        return SimpleNamespace(results=[SimpleNamespace(title=f"Page {i}", text=self.page_text) for i in ids])
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        kind, weight = part.split("=")
+        if kind not in QUERIES:
+            raise SystemExit(f"Unknown query kind '{kind}', expected one of {sorted(QUERIES)}")
+        mix[kind] = float(weight)
+    return mix
+
+
+def make_test_image(directory: str):
+    """Writes a small JPEG for image queries; returns None if Pillow is not installed."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    path = os.path.join(directory, "load_test.jpg")
+    Image.new("RGB", (256, 256), (120, 160, 200)).save(path, format="JPEG")
+    return path
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def run_request(args, kind: str, image_path, session_store, session_id: str) -> Dict[str, Any]:
+    from llao1.core.reasoning import generate_reasoning_steps
+
+    _request_state.kind = kind
+    _request_state.step = 0
+    _request_state.backend_wait = 0.0
+    _request_state.sandbox_wait = 0.0
+    prompt = random.choice(QUERIES[kind])
+    error = None
+    steps = []
+    try:
+        for steps, _, _ in generate_reasoning_steps(
+            prompt,
+            image_path=image_path if kind == "image" else None,
+            previous_messages=session_store.get_messages(session_id),
+        ):
+            pass
+        session_store.append_messages(
+            session_id,
+            [{"role": "user", "content": prompt}]
+            + [{"role": "assistant", "content": json.dumps({"title": s[0], "content": s[1]})} for s in steps],
+        )
+    except Exception as e:
+        error = str(e)
+    script = SCRIPTS[kind]
+    ran_tools = [step[3] for step in steps[:-1]]
+    expected_tools = [entry.get("tool") for entry in script]
+    if error is None and (_request_state.step != len(script) or ran_tools != expected_tools):
+        error = f"Script mismatch for '{kind}': ran {_request_state.step} of {len(script)} steps, tools {ran_tools} != {expected_tools}"
+    return {
+        "kind": kind,
+        "steps": len(steps),
+        "wait": _request_state.backend_wait + _request_state.sandbox_wait,
+        "error": error,
+    }
+
+
+def run_level(args, concurrency: int, mix: Dict[str, float], image_path) -> Dict[str, Any]:
+    from llao1.core.sessions import SessionStore
+
+    session_store = SessionStore(db_path="")
+    kinds, weights = zip(*mix.items())
+    records: List[Dict[str, Any]] = []
+    records_lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+    rss_samples = [current_rss_mb()]
+    sampling = threading.Event()
+
+    def sample_memory():
+        while not sampling.wait(0.1):
+            rss_samples.append(current_rss_mb())
+
+    def serve(arrival: float, user: int):
+        start = time.perf_counter()
+        result = run_request(args, random.choices(kinds, weights)[0], image_path, session_store, f"user-{user}")
+        end = time.perf_counter()
+        result.update(
+            latency=end - arrival,
+            queue_delay=(start - arrival) + result["wait"],
+            finished=end,
+        )
+        with records_lock:
+            records.append(result)
+
+    def closed_loop_user(user: int):
+        while time.perf_counter() < stop_at:
+            serve(time.perf_counter(), user)
+            time.sleep(random.expovariate(1 / args.think_time) if args.think_time > 0 else 0)
+
+    def open_loop_worker(arrivals: "queue.Queue"):
+        while True:
+            item = arrivals.get()
+            if item is None:
+                return
+            serve(*item)
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    level_start = time.perf_counter()
+    if args.arrival_rate:
+        arrivals: "queue.Queue" = queue.Queue()
+        workers = [threading.Thread(target=open_loop_worker, args=(arrivals,)) for _ in range(concurrency)]
+        for worker in workers:
+            worker.start()
+        user = 0
+        while time.perf_counter() < stop_at:
+            arrivals.put((time.perf_counter(), user % max(1, args.users)))
+            user += 1
+            time.sleep(random.expovariate(args.arrival_rate))
+        for _ in workers:
+            arrivals.put(None)
+    else:
+        workers = [threading.Thread(target=closed_loop_user, args=(user,)) for user in range(concurrency)]
+        for worker in workers:
+            worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - level_start
+    sampling.set()
+    sampler.join()
+
+    ok = [r for r in records if r["error"] is None]
+    latencies = [r["latency"] for r in ok]
+    queue_delays = [r["queue_delay"] for r in ok]
+    level = {
+        "concurrency": concurrency,
+        "requests": len(records),
+        "errors": len(records) - len(ok),
+        "throughput": len(ok) / elapsed if elapsed else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "queue_p50": percentile(queue_delays, 50),
+        "queue_p95": percentile(queue_delays, 95),
+        "rss_peak_mb": max(rss_samples),
+        "rss_growth_mb": max(rss_samples) - rss_samples[0],
+        "session_bytes": session_store.stats()["bytes"],
+        "error_samples": sorted({r["error"] for r in records if r["error"]})[:3],
+    }
+    session_store.close()
+    return level
+
+
+def print_report(levels: List[Dict[str, Any]], baseline: Dict[int, Dict[str, Any]]):
+    header = f"{'conc':>5} {'reqs':>6} {'err':>4} {'thru/s':>8} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'q95 s':>8} {'rss MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for level in levels:
+        line = (
+            f"{level['concurrency']:>5} {level['requests']:>6} {level['errors']:>4} {level['throughput']:>8.2f} "
+            f"{level['latency_p50']:>8.2f} {level['latency_p95']:>8.2f} {level['latency_p99']:>8.2f} "
+            f"{level['queue_p95']:>8.2f} {level['rss_peak_mb']:>8.1f}"
+        )
+        old = baseline.get(level["concurrency"])
+        if old:
+            line += f"   vs baseline: thru {level['throughput'] - old['throughput']:+.2f}/s, p95 {level['latency_p95'] - old['latency_p95']:+.2f}s"
+        print(line)
+        for error in level["error_samples"]:
+            print(f"      error: {error}")
+
+    print("\nSaturation curve (throughput | p95 latency):")
+    max_thru = max((level["throughput"] for level in levels), default=0) or 1
+    max_p95 = max((level["latency_p95"] for level in levels), default=0) or 1
+    for level in levels:
+        thru_bar = "#" * int(30 * level["throughput"] / max_thru)
+        p95_bar = "*" * int(30 * level["latency_p95"] / max_p95)
+        print(f"{level['concurrency']:>5} {thru_bar:<30} | {p95_bar}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Comma-separated concurrency levels.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per concurrency level.")
+    parser.add_argument("--arrival-rate", type=float, default=0.0, help="Poisson arrivals per second (open loop); 0 runs closed-loop users.")
+    parser.add_argument("--users", type=int, default=50, help="Distinct session histories in open-loop mode.")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between a closed-loop user's queries.")
+    parser.add_argument("--mix", default="text=0.6,image=0.2,tools=0.2", help="Query mix weights by kind.")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="Median seconds per reasoning step call.")
+    parser.add_argument("--final-latency", type=float, default=1.5, help="Median seconds for the final answer call.")
+    parser.add_argument("--exa-latency", type=float, default=0.5, help="Median seconds per Exa call.")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="Log-normal sigma for all mock latencies.")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on all mock latencies.")
+    parser.add_argument("--backend-parallel", type=int, default=4, help="Parallel requests the mock Ollama server serves.")
+    parser.add_argument("--page-chars", type=int, default=20000, help="Characters per mock fetched page.")
+    parser.add_argument("--label", default=time.strftime("%Y%m%d-%H%M%S"), help="Name of this run, e.g. a release tag.")
+    parser.add_argument("--output-dir", default="benchmarks/results")
+    parser.add_argument("--compare", help="Previous results JSON to compare against.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Keep llao1 debug logs on stdout.")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    mix = parse_mix(args.mix)
+    with tempfile.TemporaryDirectory(prefix="llao1-load-") as scratch:
+        os.environ.setdefault("LLAO1_OUTPUT_DIR", os.path.join(scratch, "outputs"))
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        from llao1.core import llm_interface, tools
+
+        llm_backend = MockBackend(args.llm_latency, args.latency_sigma, args.backend_parallel, args.latency_scale)
+        exa_backend = MockBackend(args.exa_latency, args.latency_sigma, 64, args.latency_scale)
+        ollama_client = MockOllamaClient(llm_backend, args.final_latency)
+        exa_client = MockExaClient(exa_backend, args.page_chars)
+        llm_interface.get_ollama_client = lambda: ollama_client
+        tools.get_exa_client = lambda: exa_client
+        tools._sandbox_slots = TimedSlots(tools._sandbox_slots)
+
+        image_path = make_test_image(scratch)
+        if image_path is None and "image" in mix:
+            # Without an image the request would take the encoding error path and still look like a success
+            print("Pillow is not installed, image queries are excluded from the mix.")
+            del mix["image"]
+            if not mix:
+                raise SystemExit("No query kinds left to run.")
+
+        baseline = {}
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+
+        levels = []
+        with open(os.devnull, "w") as devnull:
+            for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                print(f"Running concurrency {concurrency} for {args.duration:.0f}s...", flush=True)
+                with contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+                    levels.append(run_level(args, concurrency, mix, image_path))
+
+    print()
+    print_report(levels, baseline)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    json_path = os.path.join(args.output_dir, f"{args.label}.json")
+    with open(json_path, "w") as f:
+        json.dump({"label": args.label, "config": dict(vars(args), mix=mix), "levels": levels}, f, indent=4)
+    csv_path = os.path.join(args.output_dir, f"{args.label}.csv")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(levels[0]))
+        writer.writeheader()
+        writer.writerows(levels)
+    print(f"\nResults written to {json_path} and {csv_path}")
+
+
+if __name__ == "__main__":
+    main()
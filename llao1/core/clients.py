@@ -0,0 +1,36 @@
+# LLao1/llao1/core/clients.py
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_ollama_client():
+    """
+    Returns the process-wide Ollama client, importing the ollama package on first use.
+
+    The client reads OLLAMA_HOST like the module-level ollama functions do.
+
+    Returns:
+        An ollama.Client instance.
+    """
+    import ollama
+
+    print("[DEBUG] llao1.core.clients.get_ollama_client :: Creating Ollama client")
+    return ollama.Client()
+
+
+@lru_cache(maxsize=None)
+def get_exa_client():
+    """
+    Returns the process-wide Exa client, importing exa_py on first use.
+
+    Returns:
+        An Exa client, or None if EXA_API_KEY is not set.
+    """
+    api_key = os.environ.get("EXA_API_KEY")
+    if not api_key:
+        return None
+    from exa_py import Exa
+
+    print("[DEBUG] llao1.core.clients.get_exa_client :: Creating Exa client")
+    return Exa(api_key=api_key)
@@ -1,8 +1,281 @@
 # LLao1/llao1/core/llm_interface.py
-import ollama
 import json
 import time
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Iterable
+from llao1.core.clients import get_ollama_client
+from llao1.utils.config import (
+    OLLAMA_KEEP_ALIVE,
+    WARMUP_MODELS,
+    MODEL_ROUTES,
+    ROUTE_ONLY_WARM_MODELS,
+    OLLAMA_PS_CACHE_SECONDS,
+    WARMUP_RETRY_SECONDS,
+    WARMUP_RETRY_MAX_SECONDS,
+    MODEL_CONFLICT_COOLDOWN,
+)
+
+# Per-model warm-up results and last-use timestamps, shared by the whole process
+MODEL_LOAD_STATS: Dict[str, Dict[str, Any]] = {}
+
+# Models Ollama reported as loaded at the last `ps` call
+_resident_cache: Dict[str, Any] = {"models": set(), "checked_at": 0.0}
+
+# Optional models that could not stay loaded next to the required ones, mapped to when they may be tried again
+_model_conflicts: Dict[str, float] = {}
+
+# Guards MODEL_LOAD_STATS, _resident_cache and _model_conflicts; never held during an Ollama call
+_stats_lock = threading.Lock()
+# Serializes `ps` calls so concurrent sessions share one residency check
+_ps_lock = threading.Lock()
+# One lock per model so concurrent sessions never load the same model twice
+_warmup_locks: Dict[str, threading.Lock] = {}
+
+
+def _full_model_name(model: str) -> str:
+    return model if ":" in model else f"{model}:latest"
+
+
+def _warmup_lock(model: str) -> threading.Lock:
+    with _stats_lock:
+        return _warmup_locks.setdefault(model, threading.Lock())
+
+
+def _model_stats(model: str) -> Dict[str, Any]:
+    with _stats_lock:
+        return dict(MODEL_LOAD_STATS.get(model, {}))
+
+
+def _record_failure(model: str, available: bool, error: str):
+    """Records a failed warm-up and schedules the next attempt with exponential backoff."""
+    with _stats_lock:
+        failures = MODEL_LOAD_STATS.get(model, {}).get("failures", 0) + 1
+        delay = min(WARMUP_RETRY_SECONDS * 2 ** (failures - 1), WARMUP_RETRY_MAX_SECONDS)
+        MODEL_LOAD_STATS[model] = {
+            "available": available,
+            "error": error,
+            "failures": failures,
+            "retry_at": time.time() + delay,
+            "checked_at": time.time(),
+        }
+    print(f"[DEBUG] llao1.core.llm_interface.warm_up_models :: Next warm-up of {model} in {delay:.0f}s")
+
+
+def _invalidate_resident_cache():
+    with _stats_lock:
+        _resident_cache["checked_at"] = 0.0
+
+
+def warm_up_models(
+    models: List[str] = WARMUP_MODELS, keep_alive: int = OLLAMA_KEEP_ALIVE
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Preloads models into Ollama with an empty request so the first query does not pay the load time.
+
+    Each model is loaded under its own lock, so sessions that ask for the same
+    model at once wait for a single load instead of starting another one.
+    Failures are retried with exponential backoff (see ensure_models_warm).
+
+    Args:
+        models: The Ollama models to preload.
+        keep_alive: Seconds Ollama should keep each model resident.
+
+    Returns:
+        A dictionary mapping each model to its availability, load duration and error, if any.
+    """
+    for model in dict.fromkeys(models):
+        requested = time.time()
+        with _warmup_lock(model):
+            if _model_stats(model).get("checked_at", 0.0) >= requested:
+                continue  # another session warmed it while we waited for the lock
+            started = time.time()
+            print(f"[INFO] llao1.core.llm_interface.warm_up_models :: Warming up model: {model}")
+            try:
+                get_ollama_client().show(model)
+            except Exception as e:
+                print(f"[ERROR] llao1.core.llm_interface.warm_up_models :: Model {model} is not available: {e}")
+                _record_failure(model, False, str(e))
+                continue
+            try:
+                response = get_ollama_client().generate(model=model, prompt="", keep_alive=keep_alive)
+                load_duration = (response.get("load_duration") or 0) / 1e9
+                with _stats_lock:
+                    MODEL_LOAD_STATS[model] = {
+                        "available": True,
+                        "load_duration": load_duration,
+                        "warmup_time": time.time() - started,
+                        "checked_at": time.time(),
+                        "last_used": time.time(),
+                    }
+                    _resident_cache["checked_at"] = 0.0
+                print(
+                    f"[INFO] llao1.core.llm_interface.warm_up_models :: Model {model} loaded in {load_duration:.2f}s"
+                )
+            except Exception as e:
+                print(f"[ERROR] llao1.core.llm_interface.warm_up_models :: Failed to preload model {model}: {e}")
+                _record_failure(model, True, str(e))
+    return {model: _model_stats(model) for model in models}
+
+
+def resident_models() -> set:
+    """
+    Returns the models Ollama currently has loaded, reusing the answer for OLLAMA_PS_CACHE_SECONDS.
+
+    Returns:
+        A set of fully tagged model names, empty if Ollama cannot be reached.
+    """
+    with _ps_lock:
+        with _stats_lock:
+            if time.time() - _resident_cache["checked_at"] < OLLAMA_PS_CACHE_SECONDS:
+                return _resident_cache["models"]
+        try:
+            response = get_ollama_client().ps()
+            models = {
+                _full_model_name(m.get("model") or m.get("name"))
+                for m in response["models"]
+            }
+        except Exception as e:
+            print(f"[ERROR] llao1.core.llm_interface.resident_models :: Could not query loaded models: {e}")
+            models = set()
+        with _stats_lock:
+            _resident_cache["models"] = models
+            _resident_cache["checked_at"] = time.time()
+        return models
+
+
+def is_model_warm(model: str) -> bool:
+    """
+    Checks whether Ollama currently keeps a model loaded.
+
+    Args:
+        model: The Ollama model.
+
+    Returns:
+        True if the model is resident.
+    """
+    return _full_model_name(model) in resident_models()
+
+
+def is_model_conflicted(model: str) -> bool:
+    """
+    Checks whether a model was recently found unable to stay loaded next to the required models.
+
+    Args:
+        model: The Ollama model.
+
+    Returns:
+        True while the model is skipped for warm-up and routing.
+    """
+    with _stats_lock:
+        return _model_conflicts.get(model, 0.0) > time.time()
+
+
+def _needs_warm_up(model: str) -> bool:
+    stats = _model_stats(model)
+    if "retry_at" in stats:
+        return stats["retry_at"] <= time.time()
+    return not stats.get("available") or not is_model_warm(model)
+
+
+def ensure_models_warm(
+    models: List[str], optional: Iterable[str] = ()
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Warms the models that are not resident, retrying failed warm-ups with backoff.
+
+    Optional models (such as routing targets) are warmed after the required
+    ones. If loading them pushes a required model out of memory, Ollama
+    cannot keep both resident: the optional models are then skipped for
+    warm-up and routing for MODEL_CONFLICT_COOLDOWN seconds, and the
+    required models are loaded again.
+
+    Args:
+        models: The Ollama models that must be loaded.
+        optional: Models to keep loaded as well when memory allows.
+
+    Returns:
+        A dictionary mapping each model to its latest warm-up stats.
+    """
+    required = list(dict.fromkeys(models))
+    extra = [
+        model
+        for model in dict.fromkeys(optional)
+        if model not in required and not is_model_conflicted(model)
+    ]
+    cold = [model for model in required + extra if _needs_warm_up(model)]
+    if cold:
+        warm_up_models(cold)
+    if cold and extra:
+        _invalidate_resident_cache()
+        resident = resident_models()
+        evicted = [
+            model
+            for model in required
+            if _model_stats(model).get("available")
+            and "error" not in _model_stats(model)
+            and _full_model_name(model) not in resident
+        ]
+        if resident and evicted:
+            loaded = [model for model in extra if model in cold]
+            with _stats_lock:
+                for model in loaded:
+                    _model_conflicts[model] = time.time() + MODEL_CONFLICT_COOLDOWN
+            print(
+                f"[INFO] llao1.core.llm_interface.ensure_models_warm :: Loading {', '.join(loaded)} evicted {', '.join(evicted)}; "
+                f"skipping them for {MODEL_CONFLICT_COOLDOWN}s"
+            )
+            warm_up_models(evicted)
+    return {model: _model_stats(model) for model in required + extra}
+
+
+def route_model(step: str, requested_model: str, has_image: bool = False) -> str:
+    """
+    Picks the model for a step according to MODEL_ROUTES.
+
+    Cheap steps go to the configured small model only when Ollama reports it as
+    loaded, it has not been found to evict the other models, and the
+    conversation has no image. Otherwise the requested model is kept.
+
+    Args:
+        step: The step kind, e.g. "reasoning" or "final_answer".
+        requested_model: The model selected by the user.
+        has_image: Whether the conversation includes an image.
+
+    Returns:
+        The model to use for the step.
+    """
+    target = MODEL_ROUTES.get(step)
+    if not target or target == requested_model or has_image:
+        return requested_model
+    if is_model_conflicted(target):
+        print(
+            f"[DEBUG] llao1.core.llm_interface.route_model :: {target} cannot stay loaded with {requested_model}, keeping {requested_model} for {step}"
+        )
+        return requested_model
+    if ROUTE_ONLY_WARM_MODELS and not is_model_warm(target):
+        print(
+            f"[DEBUG] llao1.core.llm_interface.route_model :: {target} is not warm, keeping {requested_model} for {step}"
+        )
+        return requested_model
+    print(f"[DEBUG] llao1.core.llm_interface.route_model :: Routing {step} to {target}")
+    return target
+
+
+def _record_call(model: str, response) -> None:
+    """Marks a model as recently used and records any load time Ollama reported for the call."""
+    load_duration = (response.get("load_duration") or 0) / 1e9
+    with _stats_lock:
+        stats = MODEL_LOAD_STATS.setdefault(model, {"available": True})
+        if "error" in stats:  # the model answered, so a failed warm-up no longer applies
+            stats = MODEL_LOAD_STATS[model] = {"available": True}
+        stats["last_used"] = time.time()
+        if load_duration > 1:
+            stats["load_duration"] = load_duration
+            _resident_cache["checked_at"] = 0.0
+    if load_duration > 1:
+        print(
+            f"[INFO] llao1.core.llm_interface.make_ollama_api_call :: Model {model} was cold-loaded in {load_duration:.2f}s"
+        )
 
 
 def make_ollama_api_call(
@@ -28,21 +301,25 @@ def make_ollama_api_call(
     for attempt in range(3):
         try:
             if is_final_answer:
-                response = ollama.chat(
+                response = get_ollama_client().chat(
                     model=model,
                     messages=messages,
                     options={"temperature": temperature, "num_predict": max_tokens},
                     stream=False,
+                    keep_alive=OLLAMA_KEEP_ALIVE,
                 )
+                _record_call(model, response)
                 return response["message"]["content"]
             else:
-                response = ollama.chat(
+                response = get_ollama_client().chat(
                     model=model,
                     messages=messages,
                     options={"temperature": temperature, "num_predict": max_tokens},
                     format="json",
                     stream=False,
+                    keep_alive=OLLAMA_KEEP_ALIVE,
                 )
+                _record_call(model, response)
                 try:
                     return json.loads(response["message"]["content"])
                 except json.JSONDecodeError:
@@ -0,0 +1,535 @@
+# LLao1/llao1/core/local_index.py
+import os
+import re
+import json
+import math
+import time
+import shutil
+import hashlib
+import threading
+from collections import Counter
+from typing import List, Dict, Tuple, Any, Optional
+import numpy as np
+from llao1.core.clients import get_ollama_client
+from llao1.utils.config import (
+    LOCAL_DOCS_DIR,
+    LOCAL_INDEX_DIR,
+    LOCAL_EMBEDDING_MODEL,
+    LOCAL_CHUNK_SIZE,
+    LOCAL_CHUNK_OVERLAP,
+    LOCAL_INDEX_EXTENSIONS,
+    LOCAL_INDEX_REFRESH_INTERVAL,
+)
+
+MANIFEST_FILE = "manifest.json"
+GENERATION_PREFIX = "gen-"
+CHUNKS_FILE = "chunks.jsonl"
+EMBEDDINGS_FILE = "embeddings.npy"
+
+EMBED_BATCH_SIZE = 32
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60
+
+_TOKEN_RE = re.compile(r"\w+")
+_indexes: Dict[Tuple[str, str, str], "LocalIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens for BM25 scoring.
+
+    Args:
+        text: The text to tokenize.
+
+    Returns:
+        A list of tokens.
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+def chunk_text(
+    text: str, chunk_size: int = LOCAL_CHUNK_SIZE, overlap: int = LOCAL_CHUNK_OVERLAP
+) -> List[str]:
+    """
+    Splits text into overlapping windows of words.
+
+    Args:
+        text: The document text.
+        chunk_size: Number of words per chunk.
+        overlap: Number of words shared between consecutive chunks.
+
+    Returns:
+        A list of chunk strings.
+    """
+    words = text.split()
+    if not words:
+        return []
+    stride = max(1, chunk_size - overlap)
+    chunks = []
+    for start in range(0, len(words), stride):
+        chunks.append(" ".join(words[start : start + chunk_size]))
+        if start + chunk_size >= len(words):
+            break
+    return chunks
+
+
+def embed_texts(texts: List[str], model: str = LOCAL_EMBEDDING_MODEL) -> np.ndarray:
+    """
+    Embeds texts with Ollama and L2-normalizes the rows.
+
+    Args:
+        texts: The texts to embed.
+        model: The Ollama embedding model.
+
+    Returns:
+        A float32 matrix with one normalized embedding per row.
+    """
+    vectors = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        response = get_ollama_client().embed(
+            model=model, input=texts[start : start + EMBED_BATCH_SIZE]
+        )
+        vectors.extend(response["embeddings"])
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LocalIndex:
+    """
+    Persistent hybrid (embedding + BM25) index over a directory of documents.
+
+    Each version of the index is a generation directory holding the chunk
+    list and a memory-mapped .npy embedding matrix; manifest.json names the
+    current one. Re-indexing is incremental: only files whose size, mtime
+    and content hash changed are re-chunked and re-embedded. If embedding
+    fails before any vectors exist, the index is published for BM25 only.
+
+    Everything a search reads is kept in one immutable state dictionary that a
+    refresh replaces with a single assignment, so searches never block on a
+    refresh and never see chunks and embedding rows from different versions.
+    Only refreshes are serialized.
+    """
+
+    def __init__(
+        self,
+        docs_dir: str = LOCAL_DOCS_DIR,
+        index_dir: str = LOCAL_INDEX_DIR,
+        embedding_model: str = LOCAL_EMBEDDING_MODEL,
+    ):
+        self.docs_dir = os.path.abspath(docs_dir)
+        self.index_dir = os.path.abspath(index_dir)
+        self.embedding_model = embedding_model
+        self.last_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._state: Dict[str, Any] = self._load()
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        return self._state["manifest"]
+
+    @property
+    def chunks(self) -> List[Dict[str, Any]]:
+        return self._state["chunks"]
+
+    @property
+    def is_ready(self) -> bool:
+        """True once a generation has been published, even if it holds no chunks."""
+        return "generation" in self._state["manifest"]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _load(self) -> Dict[str, Any]:
+        """Reads the generation the manifest points to into a new state, or an empty state if it is missing or inconsistent."""
+        empty = {"embedding_model": self.embedding_model, "files": {}}
+        manifest, chunks, embeddings = empty, [], None
+        try:
+            with open(self._path(MANIFEST_FILE), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            generation = self._path(manifest["generation"])
+            with open(os.path.join(generation, CHUNKS_FILE), "r", encoding="utf-8") as f:
+                chunks = [json.loads(line) for line in f if line.strip()]
+            rows = len(chunks)
+            if manifest.get("dim"):
+                embeddings = np.load(os.path.join(generation, EMBEDDINGS_FILE), mmap_mode="r")
+                rows = embeddings.shape[0]
+            expected = sum(entry["count"] for entry in manifest["files"].values())
+            if not len(chunks) == rows == expected:
+                raise ValueError(
+                    f"{len(chunks)} chunks, {rows} embedding rows and {expected} chunks in the manifest"
+                )
+            print(
+                f"[DEBUG] llao1.core.local_index.LocalIndex._load :: Loaded {len(chunks)} chunks from {generation}"
+            )
+        except FileNotFoundError:
+            manifest, chunks, embeddings = empty, [], None
+        except (KeyError, ValueError) as e:
+            print(
+                f"[ERROR] llao1.core.local_index.LocalIndex._load :: Index in {self.index_dir} is inconsistent ({e}), it will be rebuilt"
+            )
+            manifest, chunks, embeddings = empty, [], None
+        if manifest.get("embedding_model") != self.embedding_model:
+            print(
+                f"[INFO] llao1.core.local_index.LocalIndex._load :: Embedding model changed, index will be rebuilt"
+            )
+            manifest, chunks, embeddings = empty, [], None
+        state = {
+            "manifest": manifest,
+            "chunks": chunks,
+            "embeddings": embeddings,
+        }
+        state.update(self._build_bm25(chunks))
+        return state
+
+    def _iter_documents(self):
+        for root, _, files in os.walk(self.docs_dir):
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in LOCAL_INDEX_EXTENSIONS:
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, self.docs_dir), path
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Incrementally re-indexes the documents directory.
+
+        If another thread is already refreshing this index the call returns
+        immediately and searches keep using the current state.
+
+        Args:
+            force: Re-scan even if the refresh interval has not elapsed.
+
+        Returns:
+            True if a new index generation was published.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            now = time.time()
+            if not force and now - self.last_refresh < LOCAL_INDEX_REFRESH_INTERVAL:
+                return False
+            self.last_refresh = now
+            return self._refresh(self._state)
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_in_background(self, force: bool = False) -> bool:
+        """
+        Starts a refresh on a daemon thread unless one is running or the index is still fresh.
+
+        Args:
+            force: Re-scan even if the refresh interval has not elapsed.
+
+        Returns:
+            True if a refresh thread was started.
+        """
+        if self._refresh_lock.locked():
+            return False
+        if not force and time.time() - self.last_refresh < LOCAL_INDEX_REFRESH_INTERVAL:
+            return False
+        threading.Thread(
+            target=self._refresh_safely, args=(force,), name="llao1-local-index", daemon=True
+        ).start()
+        return True
+
+    def _refresh_safely(self, force: bool):
+        try:
+            self.refresh(force=force)
+        except Exception as e:
+            print(f"[ERROR] llao1.core.local_index.LocalIndex.refresh :: Refreshing {self.docs_dir} failed: {e}")
+
+    def _refresh(self, state: Dict[str, Any]) -> bool:
+        old_files = state["manifest"].get("files", {})
+        embeddings = state["embeddings"]
+        new_files: Dict[str, Dict[str, Any]] = {}
+        new_chunks: List[Dict[str, Any]] = []
+        sources: List[int] = []  # embedding row to copy for each new chunk, -1 if it must be embedded
+        changed = False
+
+        for rel_path, path in self._iter_documents():
+            stat = os.stat(path)
+            entry = old_files.get(rel_path)
+            unchanged = (
+                entry is not None
+                and entry["size"] == stat.st_size
+                and entry["mtime"] == stat.st_mtime
+            )
+            sha = entry["sha256"] if unchanged else _file_sha256(path)
+            if entry is not None and entry["sha256"] == sha:
+                start = len(new_chunks)
+                for offset in range(entry["count"]):
+                    sources.append(entry["start"] + offset if embeddings is not None else -1)
+                    new_chunks.append(state["chunks"][entry["start"] + offset])
+                changed = changed or entry["start"] != start or not unchanged
+                new_files[rel_path] = dict(
+                    entry, start=start, mtime=stat.st_mtime, size=stat.st_size
+                )
+                continue
+
+            changed = True
+            try:
+                with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                    pieces = chunk_text(f.read())
+            except OSError as e:
+                print(
+                    f"[ERROR] llao1.core.local_index.LocalIndex.refresh :: Could not read {path}: {e}"
+                )
+                continue
+            print(
+                f"[DEBUG] llao1.core.local_index.LocalIndex.refresh :: Indexing {rel_path} ({len(pieces)} chunks)"
+            )
+            start = len(new_chunks)
+            for number, piece in enumerate(pieces):
+                sources.append(-1)
+                new_chunks.append({"path": rel_path, "chunk": number, "text": piece})
+            new_files[rel_path] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "sha256": sha,
+                "start": start,
+                "count": len(pieces),
+            }
+
+        if set(new_files) != set(old_files):
+            changed = True
+        # A keyword-only index is retried on every refresh until embedding succeeds.
+        if not changed and (embeddings is not None or not new_chunks):
+            return False
+
+        directory = self._path(f"{GENERATION_PREFIX}{time.time_ns()}")
+        os.makedirs(directory)
+        try:
+            dim = self._write_embeddings(directory, new_chunks, sources, embeddings)
+        except Exception as e:
+            shutil.rmtree(directory, ignore_errors=True)
+            if embeddings is not None or not changed:
+                print(
+                    f"[ERROR] llao1.core.local_index.LocalIndex.refresh :: Embedding failed ({e}), keeping the current index"
+                )
+                return False
+            print(
+                f"[ERROR] llao1.core.local_index.LocalIndex.refresh :: Embedding failed ({e}), indexing for keyword search only"
+            )
+            os.makedirs(directory)
+            dim = None
+
+        self._publish(directory, new_files, new_chunks, dim)
+        print(
+            f"[INFO] llao1.core.local_index.LocalIndex.refresh :: Index updated: {len(new_files)} files, {len(new_chunks)} chunks, {sources.count(-1) if dim else 0} newly embedded"
+        )
+        return True
+
+    def _write_embeddings(self, directory, chunks, sources, embeddings) -> Optional[int]:
+        """
+        Streams reused rows and new embeddings into the generation's memory-mapped matrix.
+
+        Only one embedding batch is held in memory at a time, and reused rows
+        are copied from the previous matrix in contiguous runs.
+
+        Returns:
+            The embedding dimension, or None if there is nothing to embed.
+        """
+        pending = [row for row, source in enumerate(sources) if source < 0]
+        batches = [pending[i : i + EMBED_BATCH_SIZE] for i in range(0, len(pending), EMBED_BATCH_SIZE)]
+        first = None
+        if embeddings is not None:
+            dim = embeddings.shape[1]
+        elif batches:
+            first = embed_texts([chunks[row]["text"] for row in batches[0]], self.embedding_model)
+            dim = first.shape[1]
+        else:
+            return None
+
+        matrix = np.lib.format.open_memmap(
+            os.path.join(directory, EMBEDDINGS_FILE),
+            mode="w+",
+            dtype=np.float32,
+            shape=(len(chunks), dim),
+        )
+        row = 0
+        while row < len(sources):
+            end = row + 1
+            if sources[row] >= 0:
+                while end < len(sources) and sources[end] == sources[end - 1] + 1:
+                    end += 1
+                matrix[row:end] = embeddings[sources[row] : sources[row] + end - row]
+            row = end
+        for number, batch in enumerate(batches):
+            if number == 0 and first is not None:
+                matrix[batch] = first
+            else:
+                matrix[batch] = embed_texts([chunks[row]["text"] for row in batch], self.embedding_model)
+        matrix.flush()
+        del matrix
+        return dim
+
+    def _publish(self, directory, files, chunks, dim):
+        """
+        Writes the chunk list into a generation directory, then points the manifest at it.
+
+        Replacing the manifest is the only step that changes what readers
+        see, so a crash or a concurrent reader never observes chunks and
+        embeddings from different generations.
+        """
+        previous = self._state["manifest"].get("generation")
+        generation = os.path.basename(directory)
+        with open(os.path.join(directory, CHUNKS_FILE), "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(json.dumps(chunk) + "\n")
+
+        manifest = {
+            "embedding_model": self.embedding_model,
+            "dim": dim,
+            "generation": generation,
+            "files": files,
+        }
+        tmp = self._path(MANIFEST_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._path(MANIFEST_FILE))
+        self._state = self._load()
+        self._prune_generations(previous or generation)
+
+    def _prune_generations(self, keep_from: str):
+        """Deletes generations older than keep_from; the one just replaced stays for readers that loaded it a moment ago."""
+        for name in os.listdir(self.index_dir):
+            if name.startswith(GENERATION_PREFIX) and name < keep_from:
+                shutil.rmtree(self._path(name), ignore_errors=True)
+
+    def _build_bm25(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_lengths: List[int] = []
+        for row, chunk in enumerate(chunks):
+            tokens = tokenize(chunk["text"])
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((row, tf))
+        avg_doc_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+        return {
+            "postings": postings,
+            "doc_lengths": doc_lengths,
+            "avg_doc_length": avg_doc_length,
+        }
+
+    def _bm25_rank(self, state: Dict[str, Any], query: str, limit: int) -> List[int]:
+        scores: Dict[int, float] = {}
+        n = len(state["chunks"])
+        doc_lengths = state["doc_lengths"]
+        for term in set(tokenize(query)):
+            postings = state["postings"].get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for row, tf in postings:
+                norm = 1 - BM25_B + BM25_B * doc_lengths[row] / state["avg_doc_length"]
+                scores[row] = scores.get(row, 0.0) + idf * tf * (BM25_K1 + 1) / (
+                    tf + BM25_K1 * norm
+                )
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+    def _vector_rank(self, state: Dict[str, Any], query: str, limit: int) -> List[int]:
+        embeddings = state["embeddings"]
+        if embeddings is None or not len(state["chunks"]):
+            return []
+        query_vector = embed_texts([query], self.embedding_model)[0]
+        scores = np.asarray(embeddings @ query_vector)
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        return [int(row) for row in top[np.argsort(-scores[top])]]
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Ranks chunks by reciprocal-rank fusion of embedding and BM25 results.
+
+        Falls back to BM25 alone when the index has no embeddings or the
+        query cannot be embedded.
+
+        Args:
+            query: The search query.
+            top_k: The number of chunks to return.
+
+        Returns:
+            A list of chunk dictionaries with an added 'score' key.
+        """
+        state = self._state
+        depth = max(top_k * 4, 20)
+        fused: Dict[int, float] = {}
+        try:
+            vector_ranking = self._vector_rank(state, query, depth)
+        except Exception as e:
+            print(
+                f"[ERROR] llao1.core.local_index.LocalIndex.search :: Embedding the query failed ({e}), using keyword ranking only"
+            )
+            vector_ranking = []
+        rankings = (vector_ranking, self._bm25_rank(state, query, depth))
+        for ranking in rankings:
+            for rank, row in enumerate(ranking):
+                fused[row] = fused.get(row, 0.0) + 1.0 / (RRF_K + rank + 1)
+        best = sorted(fused, key=fused.get, reverse=True)[:top_k]
+        return [dict(state["chunks"][row], score=fused[row]) for row in best]
+
+
+def get_local_index(
+    docs_dir: str = LOCAL_DOCS_DIR,
+    index_dir: str = LOCAL_INDEX_DIR,
+    embedding_model: str = LOCAL_EMBEDDING_MODEL,
+) -> LocalIndex:
+    """
+    Returns the process-wide index for a documents directory, starting a background refresh if it is stale.
+
+    The module lock only guards the index cache. Directory scans and
+    embedding run on a background thread, so searches never wait for them.
+
+    Args:
+        docs_dir: Directory containing the documents to index.
+        index_dir: Directory where the index is persisted.
+        embedding_model: The Ollama embedding model.
+
+    Returns:
+        The loaded LocalIndex.
+    """
+    key = (os.path.abspath(docs_dir), os.path.abspath(index_dir), embedding_model)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = LocalIndex(docs_dir, index_dir, embedding_model)
+            _indexes[key] = index
+    index.refresh_in_background()
+    return index
+
+
+def main():
+    """Builds or updates the index ahead of time: python -m llao1.core.local_index [--docs-dir DIR]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or update the local_search index.")
+    parser.add_argument("--docs-dir", default=LOCAL_DOCS_DIR)
+    parser.add_argument("--index-dir", default=LOCAL_INDEX_DIR)
+    parser.add_argument("--embedding-model", default=LOCAL_EMBEDDING_MODEL)
+    args = parser.parse_args()
+    if not args.docs_dir or not os.path.isdir(args.docs_dir):
+        parser.error("set LLAO1_DOCS_DIR or pass --docs-dir with an existing directory")
+
+    start = time.time()
+    index = LocalIndex(args.docs_dir, args.index_dir, args.embedding_model)
+    updated = index.refresh(force=True)
+    print(
+        f"{'Updated' if updated else 'Up to date'}: {len(index.manifest['files'])} files, "
+        f"{len(index.chunks)} chunks in {args.index_dir} ({time.time() - start:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
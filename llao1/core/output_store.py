@@ -0,0 +1,188 @@
+# LLao1/llao1/core/output_store.py
+import io
+import os
+import shutil
+import hashlib
+import tempfile
+from typing import BinaryIO
+from llao1.utils.config import (
+    TOOL_OUTPUT_LIMITS,
+    DEFAULT_TOOL_OUTPUT_LIMIT,
+    TOOL_OUTPUT_PAGE_SIZE,
+    OUTPUT_STORE_DIR,
+    OUTPUT_STORE_MAX_BYTES,
+)
+
+HANDLE_PREFIX = "out_"
+HANDLE_LENGTH = 16
+
+
+def _handle_path(handle: str) -> str:
+    digest = handle[len(HANDLE_PREFIX) :]
+    return os.path.join(OUTPUT_STORE_DIR, digest[:2], digest + ".txt")
+
+
+def _prune_store():
+    """Deletes the least recently written outputs once the store exceeds its size budget."""
+    entries = []
+    total = 0
+    for root, _, files in os.walk(OUTPUT_STORE_DIR):
+        for name in files:
+            if not name.endswith(".txt"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    for _, size, path in sorted(entries):
+        if total <= OUTPUT_STORE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def store_stream(source: BinaryIO) -> str:
+    """
+    Copies a binary stream into the content-addressed store without loading it into memory.
+
+    Args:
+        source: A readable binary file object positioned at the start of the payload.
+
+    Returns:
+        The handle of the stored output.
+    """
+    os.makedirs(OUTPUT_STORE_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=OUTPUT_STORE_DIR, delete=False) as tmp:
+        for block in iter(lambda: source.read(1 << 16), b""):
+            digest.update(block)
+            tmp.write(block)
+    handle = HANDLE_PREFIX + digest.hexdigest()[:HANDLE_LENGTH]
+    path = _handle_path(handle)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(tmp.name)
+        os.utime(path)
+    else:
+        shutil.move(tmp.name, path)
+        _prune_store()
+    print(f"[DEBUG] llao1.core.output_store.store_stream :: Stored output as {handle}")
+    return handle
+
+
+def _page_count(total: int) -> int:
+    return max(1, -(-total // TOOL_OUTPUT_PAGE_SIZE))
+
+
+def _char_start(source: BinaryIO, offset: int, total: int) -> int:
+    """Moves a byte offset forward past UTF-8 continuation bytes so slices never split a character."""
+    if offset <= 0 or offset >= total:
+        return max(0, min(offset, total))
+    source.seek(offset)
+    for byte in source.read(3):
+        if byte & 0xC0 != 0x80:
+            break
+        offset += 1
+    return offset
+
+
+def _read_range(source: BinaryIO, start: int, end: int) -> str:
+    source.seek(start)
+    return source.read(end - start).decode("utf-8", errors="replace")
+
+
+def _summary(head: str, tail: str, total: int, handle: str) -> str:
+    return (
+        f"{head}\n\n"
+        f"[... output truncated: {total} bytes total, showing the first {len(head.encode('utf-8'))} and last {len(tail.encode('utf-8'))}. "
+        f"Full output stored as '{handle}' ({_page_count(total)} pages); use the 'read_output' tool with this handle and a 'page' number to read more ...]\n\n"
+        f"{tail}"
+    )
+
+
+def bound_output(tool: str, text: str) -> str:
+    """
+    Returns the text unchanged if it fits the tool's cap, otherwise spills it to disk and returns a head/tail summary.
+
+    Args:
+        tool: The tool name used to look up the output cap (in UTF-8 bytes).
+        text: The tool output.
+
+    Returns:
+        The bounded tool output.
+    """
+    encoded = text.encode("utf-8")
+    if len(encoded) <= TOOL_OUTPUT_LIMITS.get(tool, DEFAULT_TOOL_OUTPUT_LIMIT):
+        return text
+    return bound_output_file(tool, io.BytesIO(encoded))
+
+
+def bound_output_file(tool: str, source: BinaryIO, prefix: str = "") -> str:
+    """
+    Bounds output that was captured to a file, reading only its head and tail into memory.
+
+    Args:
+        tool: The tool name used to look up the output cap (in UTF-8 bytes).
+        source: A readable binary file object holding the captured output.
+        prefix: Text prepended to the returned output, e.g. "Error: ".
+
+    Returns:
+        The bounded tool output.
+    """
+    limit = TOOL_OUTPUT_LIMITS.get(tool, DEFAULT_TOOL_OUTPUT_LIMIT)
+    source.seek(0, os.SEEK_END)
+    total = source.tell()
+    source.seek(0)
+    if total <= limit:
+        return prefix + source.read().decode("utf-8", errors="replace")
+    half = limit // 2
+    head = _read_range(source, 0, _char_start(source, half, total))
+    tail = _read_range(source, _char_start(source, total - half, total), total)
+    source.seek(0)
+    handle = store_stream(source)
+    print(
+        f"[INFO] llao1.core.output_store.bound_output_file :: {tool} output of {total} bytes spilled to {handle}"
+    )
+    return prefix + _summary(head, tail, total, handle)
+
+
+def read_output(handle: str, page: int = 1) -> str:
+    """
+    Returns one page of a previously spilled output.
+
+    Pages are TOOL_OUTPUT_PAGE_SIZE bytes, with edges moved forward to the next
+    character boundary so multi-byte characters are never split or dropped.
+
+    Args:
+        handle: The handle returned in a truncated tool result.
+        page: The 1-based page number.
+
+    Returns:
+        The requested page or an error message.
+    """
+    print(f"[DEBUG] llao1.core.output_store.read_output :: Function called with handle: {handle}, page: {page}")
+    handle = str(handle).strip()
+    if not handle.startswith(HANDLE_PREFIX) or not handle[len(HANDLE_PREFIX) :].isalnum():
+        return f"Error: Invalid output handle '{handle}'."
+    path = _handle_path(handle)
+    if not os.path.exists(path):
+        return f"Error: Output '{handle}' not found, it may have been pruned."
+    try:
+        page = max(1, int(page))
+    except (TypeError, ValueError):
+        return f"Error: Invalid page number '{page}'."
+    total = os.path.getsize(path)
+    pages = _page_count(total)
+    if page > pages:
+        return f"Error: Page {page} is out of range, '{handle}' has {pages} pages."
+    with open(path, "rb") as f:
+        start = _char_start(f, (page - 1) * TOOL_OUTPUT_PAGE_SIZE, total)
+        end = _char_start(f, page * TOOL_OUTPUT_PAGE_SIZE, total)
+        content = _read_range(f, start, end)
+    return f"[{handle} page {page}/{pages}]\n{content}"
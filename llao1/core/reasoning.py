@@ -1,7 +1,8 @@
 # LLao1/llao1/core/reasoning.py
 from typing import List, Dict, Tuple, Any, Generator
-from llao1.core.llm_interface import make_ollama_api_call
-from llao1.core.tools import execute_code, web_search, fetch_page_content
+from llao1.core.llm_interface import make_ollama_api_call, route_model
+from llao1.core.tools import execute_code, web_search, fetch_page_content, local_search
+from llao1.core.output_store import read_output
 from llao1.utils.config import DEFAULT_THINKING_TOKENS, DEFAULT_MODEL
 import json
 import time
@@ -97,14 +98,23 @@ def generate_reasoning_steps(
 
         if any(
             tool in messages[-1]["content"]
-            for tool in ["code_executor", "web_search", "fetch_page_content"]
+            for tool in [
+                "code_executor",
+                "web_search",
+                "fetch_page_content",
+                "local_search",
+                "read_output",
+            ]
         ):
             current_thinking_tokens += 100  # Increase tokens if tool is used
             print(
                 f"[DEBUG] llao1.core.reasoning.generate_reasoning_steps :: Increasing tokens by 100 since tool is used. Tokens: {current_thinking_tokens}"
             )
         step_data = make_ollama_api_call(
-            messages, current_thinking_tokens, model=model, temperature=temperature
+            messages,
+            current_thinking_tokens,
+            model=route_model("reasoning", model, has_image=bool(image_path)),
+            temperature=temperature,
         )
         end_time = time.time()
         thinking_time = end_time - start_time
@@ -136,6 +146,18 @@ def generate_reasoning_steps(
                     f"[DEBUG] llao1.core.reasoning.generate_reasoning_steps :: Fetching page content with IDs: {ids}"
                 )
                 tool_result = fetch_page_content(ids)
+            elif step_data["tool"] == "local_search":
+                num_results = step_data.get("num_results", 5)
+                print(
+                    f"[DEBUG] llao1.core.reasoning.generate_reasoning_steps :: Performing local search with query: {step_data['tool_input']}, num_results: {num_results}"
+                )
+                tool_result = local_search(step_data["tool_input"], num_results)
+            elif step_data["tool"] == "read_output":
+                page = step_data.get("page", 1)
+                print(
+                    f"[DEBUG] llao1.core.reasoning.generate_reasoning_steps :: Reading stored output: {step_data['tool_input']}, page: {page}"
+                )
+                tool_result = read_output(step_data["tool_input"], page)
             else:
                 tool_result = f"Error: Unknown tool '{step_data['tool']}'"
                 print(
@@ -203,11 +225,16 @@ def generate_reasoning_steps(
     )
 
     start_time = time.time()
+    final_model = route_model("final_answer", model, has_image=bool(image_path))
     print(
-        f"[DEBUG] llao1.core.reasoning.generate_reasoning_steps :: Calling make_ollama_api_call for final answer. Model: {model}"
+        f"[DEBUG] llao1.core.reasoning.generate_reasoning_steps :: Calling make_ollama_api_call for final answer. Model: {final_model}"
     )
     final_data = make_ollama_api_call(
-        messages, 1200, is_final_answer=True, model=model, temperature=temperature
+        messages,
+        1200,
+        is_final_answer=True,
+        model=final_model,
+        temperature=temperature,
     )
     end_time = time.time()
     thinking_time = end_time - start_time
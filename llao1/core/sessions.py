@@ -0,0 +1,213 @@
+# LLao1/llao1/core/sessions.py
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+from llao1.utils.config import (
+    SESSION_MAX_SESSIONS,
+    SESSION_MAX_MESSAGES,
+    SESSION_MAX_BYTES,
+    SESSION_IDLE_TIMEOUT,
+    SESSION_DB_PATH,
+    SESSION_DB_RETENTION,
+    SESSION_PURGE_INTERVAL,
+)
+
+
+def _message_size(message: Dict[str, Any]) -> int:
+    """Returns the UTF-8 size of a message's role and content in bytes."""
+    return len(message.get("role", "").encode("utf-8")) + len(
+        str(message.get("content", "")).encode("utf-8")
+    )
+
+
+def _newest_turn_start(messages: List[Dict[str, Any]]) -> int:
+    """Returns the index of the last user message, where the newest turn begins."""
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index].get("role") == "user":
+            return index
+    return max(0, len(messages) - 1)
+
+
+class SessionStore:
+    """
+    Bounded, thread-safe store of conversation histories shared by all sessions of a server process.
+
+    Sessions are kept in an in-process LRU. Each session is trimmed to the
+    newest messages that fit SESSION_MAX_MESSAGES and SESSION_MAX_BYTES.
+    A background timer evicts sessions idle for longer than
+    SESSION_IDLE_TIMEOUT and deletes persisted sessions past
+    SESSION_DB_RETENTION, so reads and writes never scan every session.
+    When a SQLite path is configured, histories are also persisted and
+    reloaded on the next access after eviction or a restart.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        max_messages: int = SESSION_MAX_MESSAGES,
+        max_bytes: int = SESSION_MAX_BYTES,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        db_path: str = SESSION_DB_PATH,
+        purge_interval: float = SESSION_PURGE_INTERVAL,
+    ):
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, messages TEXT NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)"
+            )
+            self._db.commit()
+            print(f"[INFO] llao1.core.sessions.SessionStore :: Persisting sessions to {db_path}")
+        self._stopped = threading.Event()
+        if purge_interval:
+            threading.Thread(
+                target=self._purge_loop, args=(purge_interval,), name="llao1-session-purge", daemon=True
+            ).start()
+
+    def _load(self, session_id: str) -> Dict[str, Any]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            messages = []
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT messages FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                if row:
+                    messages = json.loads(row[0])
+                    print(f"[DEBUG] llao1.core.sessions.SessionStore._load :: Restored session {session_id} from SQLite")
+            session = {"messages": [], "bytes": 0}
+            self._sessions[session_id] = session
+            self._add(session, messages)
+        session["last_access"] = time.time()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _add(self, session: Dict[str, Any], messages: List[Dict[str, Any]]):
+        """Appends messages and drops the oldest ones past the limits, always keeping the newest turn."""
+        history = session["messages"]
+        history.extend(messages)
+        session["bytes"] += sum(_message_size(m) for m in messages)
+        protected = _newest_turn_start(history)
+        dropped = 0
+        while dropped < protected and (
+            len(history) - dropped > self.max_messages or session["bytes"] > self.max_bytes
+        ):
+            session["bytes"] -= _message_size(history[dropped])
+            dropped += 1
+        if dropped:
+            del history[:dropped]
+            print(f"[DEBUG] llao1.core.sessions.SessionStore._add :: Dropped {dropped} oldest messages to stay within limits")
+
+    def _persist(self, session_id: str, session: Dict[str, Any]):
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, messages, last_access) VALUES (?, ?, ?)",
+            (session_id, json.dumps(session["messages"]), session["last_access"]),
+        )
+        self._db.commit()
+
+    def _evict(self):
+        while len(self._sessions) > self.max_sessions:
+            session_id, _ = self._sessions.popitem(last=False)
+            print(f"[DEBUG] llao1.core.sessions.SessionStore._evict :: Evicted least recently used session {session_id}")
+
+    def _purge_loop(self, interval: float):
+        while not self._stopped.wait(interval):
+            try:
+                self.purge()
+            except Exception as e:
+                print(f"[ERROR] llao1.core.sessions.SessionStore.purge :: Purging sessions failed: {e}")
+
+    def purge(self):
+        """Evicts idle sessions from memory and deletes persisted sessions past the retention period."""
+        now = time.time()
+        with self._lock:
+            for session_id in [
+                sid for sid, session in self._sessions.items()
+                if now - session["last_access"] > self.idle_timeout
+            ]:
+                del self._sessions[session_id]
+                print(f"[DEBUG] llao1.core.sessions.SessionStore.purge :: Evicted idle session {session_id}")
+            if self._db is not None:
+                self._db.execute("DELETE FROM sessions WHERE last_access < ?", (now - SESSION_DB_RETENTION,))
+                self._db.commit()
+
+    def get_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Returns a copy of a session's conversation history.
+
+        Args:
+            session_id: The session identifier.
+
+        Returns:
+            The list of messages, oldest first.
+        """
+        with self._lock:
+            messages = list(self._load(session_id)["messages"])
+            self._evict()
+            return messages
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]):
+        """
+        Appends messages to a session, trimming the oldest ones to stay within the per-session limits.
+
+        The newest turn, from the last user message on, is always kept, even
+        if it alone exceeds the limits.
+
+        Args:
+            session_id: The session identifier.
+            messages: The messages to append.
+        """
+        with self._lock:
+            session = self._load(session_id)
+            self._add(session, messages)
+            self._persist(session_id, session)
+            self._evict()
+
+    def clear(self, session_id: str):
+        """
+        Deletes a session from memory and from SQLite.
+
+        Args:
+            session_id: The session identifier.
+        """
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self._db.commit()
+
+    def close(self):
+        """Stops the purge timer and closes the SQLite connection."""
+        self._stopped.set()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the number of sessions, messages and UTF-8 bytes held in memory.
+
+        Returns:
+            A dictionary with 'sessions', 'messages' and 'bytes' keys.
+        """
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "messages": sum(len(s["messages"]) for s in self._sessions.values()),
+                "bytes": sum(s["bytes"] for s in self._sessions.values()),
+            }
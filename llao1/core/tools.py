@@ -1,17 +1,26 @@
 # LLao1/llao1/core/tools.py
 import subprocess
 import os
-from exa_py import Exa
+import time
+import tempfile
+import threading
+from llao1.core.clients import get_exa_client
+from llao1.core.output_store import bound_output, bound_output_file
+from llao1.utils.config import LOCAL_DOCS_DIR, CODE_OUTPUT_HARD_LIMIT, SANDBOX_MAX_WORKERS
 
-# Initialize Exa client if the key is set, otherwise set it to None
-EXA_API_KEY = os.environ.get("EXA_API_KEY")
-exa = Exa(api_key=EXA_API_KEY) if EXA_API_KEY else None
+CODE_TIMEOUT = 5  # seconds
+
+# Shared by every session in the process so concurrent users cannot fork unbounded interpreters
+_sandbox_slots = threading.BoundedSemaphore(SANDBOX_MAX_WORKERS)
 
 
 def execute_code(code: str) -> str:
     """
     Executes Python code in a sandboxed subprocess environment.
 
+    stdout and stderr are streamed to temporary files rather than held in memory,
+    and output beyond the configured cap is spilled to the output store.
+
     Args:
         code: The Python code to execute.
 
@@ -20,22 +29,39 @@ def execute_code(code: str) -> str:
     """
     print(f"[DEBUG] llao1.core.tools.execute_code :: Function called with code: {code}")
     try:
-        result = subprocess.run(
-            ["python3", "-c", code],
-            capture_output=True,
-            text=True,
-            timeout=5,
-            env={"PYTHONPATH": os.getcwd()},
-        )
-        if result.returncode == 0:
-            print(f"[DEBUG] llao1.core.tools.execute_code :: Code executed successfully. Output: {result.stdout}")
-            return result.stdout
-        else:
-            print(f"[ERROR] llao1.core.tools.execute_code :: Code execution failed. Error: {result.stderr}")
-            return f"Error: {result.stderr}"
-    except subprocess.TimeoutExpired:
-        print(f"[ERROR] llao1.core.tools.execute_code :: Code execution timed out")
-        return "Error: Code execution timed out"
+        with _sandbox_slots, tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(
+                ["python3", "-c", code],
+                stdout=stdout,
+                stderr=stderr,
+                env={"PYTHONPATH": os.getcwd()},
+            )
+            deadline = time.time() + CODE_TIMEOUT
+            while process.poll() is None:
+                if time.time() > deadline:
+                    process.kill()
+                    process.wait()
+                    print(f"[ERROR] llao1.core.tools.execute_code :: Code execution timed out")
+                    return "Error: Code execution timed out"
+                if os.fstat(stdout.fileno()).st_size + os.fstat(stderr.fileno()).st_size > CODE_OUTPUT_HARD_LIMIT:
+                    process.kill()
+                    process.wait()
+                    print(f"[ERROR] llao1.core.tools.execute_code :: Code output exceeded {CODE_OUTPUT_HARD_LIMIT} bytes")
+                    return bound_output_file(
+                        "code_executor",
+                        stdout,
+                        prefix=f"Error: Output exceeded {CODE_OUTPUT_HARD_LIMIT} bytes, execution was stopped.\n",
+                    )
+                time.sleep(0.02)
+
+            if process.returncode == 0:
+                output = bound_output_file("code_executor", stdout)
+                print(f"[DEBUG] llao1.core.tools.execute_code :: Code executed successfully. Output length: {len(output)}")
+                return output
+            else:
+                error = bound_output_file("code_executor", stderr, prefix="Error: ")
+                print(f"[ERROR] llao1.core.tools.execute_code :: Code execution failed. {error}")
+                return error
     except Exception as e:
         print(f"[ERROR] llao1.core.tools.execute_code :: An error occurred during code execution: {e}")
         return f"Error: {str(e)}"
@@ -53,6 +79,7 @@ def web_search(query: str, num_results: int = 5) -> str:
         Formatted search results.
     """
     print(f"[DEBUG] llao1.core.tools.web_search :: Function called with query: {query}, num_results: {num_results}")
+    exa = get_exa_client()
     if not exa:
       print(f"[ERROR] llao1.core.tools.web_search :: Exa API Key is not set.")
       return "Error: Exa API Key is not set."
@@ -65,7 +92,7 @@ def web_search(query: str, num_results: int = 5) -> str:
             highlights=True,
             text=True
         )
-        print(f"[DEBUG] llao1.core.tools.web_search :: Exa API search results: {search_results}")
+        print(f"[DEBUG] llao1.core.tools.web_search :: Exa API returned {len(search_results.results)} results")
 
         formatted_results = []
         for idx, result in enumerate(search_results.results):
@@ -76,8 +103,8 @@ def web_search(query: str, num_results: int = 5) -> str:
             formatted_results.append(
                 f"Result {idx + 1}:\nID: {id}\nTitle: {title}\nSnippet: {snippet}\nURL: {url}\n"
             )
-        formatted_results_str = "\n".join(formatted_results)
-        print(f"[DEBUG] llao1.core.tools.web_search :: Formatted search results: {formatted_results_str}")
+        formatted_results_str = bound_output("web_search", "\n".join(formatted_results))
+        print(f"[DEBUG] llao1.core.tools.web_search :: Formatted search results length: {len(formatted_results_str)}")
         return formatted_results_str
     except Exception as e:
         print(f"[ERROR] llao1.core.tools.web_search :: An error occurred while using Exa API: {e}")
@@ -95,12 +122,13 @@ def fetch_page_content(ids: list) -> str:
         Formatted content of the specified web pages or an error message.
     """
     print(f"[DEBUG] llao1.core.tools.fetch_page_content :: Function called with ids: {ids}")
+    exa = get_exa_client()
     if not exa:
       print(f"[ERROR] llao1.core.tools.fetch_page_content :: Exa API Key is not set.")
       return "Error: Exa API Key is not set."
     try:
         page_contents = exa.get_contents(ids, text=True)
-        print(f"[DEBUG] llao1.core.tools.fetch_page_content :: Exa API page contents: {page_contents}")
+        print(f"[DEBUG] llao1.core.tools.fetch_page_content :: Exa API returned {len(page_contents.results)} pages")
 
         formatted_contents = []
         for page in page_contents.results:
@@ -108,9 +136,46 @@ def fetch_page_content(ids: list) -> str:
             text = page.text or "No text found"
             formatted_contents.append(f"Title: {title}\nContent: {text}\n")
 
-        formatted_contents_str = "\n".join(formatted_contents)
-        print(f"[DEBUG] llao1.core.tools.fetch_page_content :: Formatted page contents: {formatted_contents_str}")
+        formatted_contents_str = bound_output("fetch_page_content", "\n".join(formatted_contents))
+        print(f"[DEBUG] llao1.core.tools.fetch_page_content :: Formatted page contents length: {len(formatted_contents_str)}")
         return formatted_contents_str
     except Exception as e:
         print(f"[ERROR] llao1.core.tools.fetch_page_content :: An error occurred while retrieving page content: {e}")
         return f"An error occurred while retrieving page content: {str(e)}"
+
+
+def local_search(query: str, num_results: int = 5) -> str:
+    """
+    Searches the local document index with hybrid embedding and BM25 ranking.
+
+    Args:
+        query: The search query.
+        num_results: The number of chunks to retrieve.
+
+    Returns:
+        Formatted search results.
+    """
+    print(f"[DEBUG] llao1.core.tools.local_search :: Function called with query: {query}, num_results: {num_results}")
+    if not LOCAL_DOCS_DIR or not os.path.isdir(LOCAL_DOCS_DIR):
+      print(f"[ERROR] llao1.core.tools.local_search :: Local document directory is not set.")
+      return "Error: Local document directory is not set (LLAO1_DOCS_DIR)."
+    try:
+        from llao1.core.local_index import get_local_index  # numpy is only needed once the tool is used
+
+        index = get_local_index(LOCAL_DOCS_DIR)
+        if not index.is_ready:
+            print(f"[INFO] llao1.core.tools.local_search :: Local index for {LOCAL_DOCS_DIR} is still being built.")
+            return "The local document index is still being built, so no results are available yet. Try local_search again later or use another tool."
+        results = index.search(query, top_k=num_results)
+
+        formatted_results = []
+        for idx, result in enumerate(results):
+            formatted_results.append(
+                f"Result {idx + 1}:\nSource: {result['path']} (chunk {result['chunk']})\nScore: {result['score']:.4f}\nSnippet: {result['text']}\n"
+            )
+        formatted_results_str = bound_output("local_search", "\n".join(formatted_results) or "No local results found.")
+        print(f"[DEBUG] llao1.core.tools.local_search :: Formatted search results length: {len(formatted_results_str)}")
+        return formatted_results_str
+    except Exception as e:
+        print(f"[ERROR] llao1.core.tools.local_search :: An error occurred while searching the local index: {e}")
+        return f"An error occurred while searching the local index: {str(e)}"
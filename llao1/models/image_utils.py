@@ -1,7 +1,6 @@
 # LLao1/llao1/models/image_utils.py
 import base64
 from io import BytesIO
-from PIL import Image
 
 def encode_image_base64(image_path):
     """
@@ -14,6 +13,8 @@ def encode_image_base64(image_path):
         A base64 encoded string of the image.
     """
     try:
+        from PIL import Image
+
         pil_image = Image.open(image_path)
         buffered = BytesIO()
         pil_image.save(buffered, format="JPEG")
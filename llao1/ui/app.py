@@ -3,28 +3,64 @@ import streamlit as st
 from llao1.core.reasoning import generate_reasoning_steps
 from llao1.ui.components import display_steps
 from llao1.utils.export import export_data
-from llao1.utils.config import DEFAULT_THINKING_TOKENS
+from llao1.core.llm_interface import ensure_models_warm
+from llao1.core.sessions import SessionStore
+from llao1.utils.config import DEFAULT_THINKING_TOKENS, DEFAULT_MODEL, WARMUP_MODELS, LOCAL_DOCS_DIR
 import os
-import tempfile
+import re
 import json
-import base64
-from PIL import Image
-from io import BytesIO
+import uuid
+import tempfile
 import traceback
 
 
+@st.cache_resource
+def get_session_store():
+    """
+    Returns the conversation store shared by every browser session of this server process.
+
+    Returns:
+        The process-wide SessionStore.
+    """
+    return SessionStore()
+
+
+@st.cache_resource
+def start_local_index():
+    """
+    Starts building the local_search index in the background once per server process.
+
+    Returns:
+        The process-wide LocalIndex, or None if LLAO1_DOCS_DIR is not set.
+    """
+    if not LOCAL_DOCS_DIR or not os.path.isdir(LOCAL_DOCS_DIR):
+        return None
+    from llao1.core.local_index import get_local_index  # numpy is only needed when local search is configured
+
+    return get_local_index(LOCAL_DOCS_DIR)
+
+
 def main():
     st.set_page_config(page_title="LLao1", page_icon="🧠", layout="wide")
     st.title("LLao1")
     st.markdown("---")
+    start_local_index()
 
     # Initialize session state for steps and errors
     if "steps" not in st.session_state:
         st.session_state["steps"] = []
     if "error" not in st.session_state:
         st.session_state["error"] = None
-    if "messages" not in st.session_state:
-        st.session_state["messages"] = []
+    if "session_id" not in st.session_state:
+        # The id lives in the URL so a reload or a server restart finds the persisted history again
+        requested_id = st.query_params.get("session", "")
+        st.session_state["session_id"] = (
+            requested_id if re.fullmatch(r"[0-9a-f]{32}", requested_id) else uuid.uuid4().hex
+        )
+    if st.query_params.get("session") != st.session_state["session_id"]:
+        st.query_params["session"] = st.session_state["session_id"]
+    session_store = get_session_store()
+    session_id = st.session_state["session_id"]
 
     # UI elements
     with st.sidebar:
@@ -39,9 +75,17 @@ def main():
         )
         model_name = st.text_input(
             "Ollama Model:",
-            value="llama3.2-vision",
+            value=DEFAULT_MODEL,
             help="The name of the ollama model.",
         )
+        with st.spinner(f"Loading {model_name}..."):
+            model_stats = ensure_models_warm([model_name], optional=WARMUP_MODELS).get(model_name, {})
+        if not model_stats.get("available"):
+            st.warning(f"Model '{model_name}' is not available in Ollama.")
+        elif "error" in model_stats:
+            st.warning(f"Model '{model_name}' could not be loaded, retrying shortly: {model_stats['error']}")
+        elif "load_duration" in model_stats:
+            st.caption(f"Model loaded in {model_stats['load_duration']:.2f}s")
         temperature = st.slider(
             "Temperature:",
             min_value=0.0,
@@ -89,10 +133,11 @@ def main():
             thinking_tokens=thinking_tokens,
             model=model_name,
             image_path=image_path,
-            previous_messages=st.session_state["messages"],
+            previous_messages=session_store.get_messages(session_id),
             temperature=temperature,
         )
         steps = []
+        new_steps = []
         total_thinking_time = 0
         step_counter = 1
         total_tokens_thinking = 0
@@ -139,19 +184,13 @@ def main():
 
                     st.session_state["steps"] = steps
 
-                    # Append assistant message to the session state
-                    st.session_state["messages"].append(
-                        {"role": "user", "content": user_query}
-                    )
-                    for (
-                        title,
-                        content,
-                        time,
-                        tool,
-                        tool_input,
-                        tool_result,
-                    ) in new_steps:
-                        st.session_state["messages"].append(
+                except StopIteration:
+                    print("[DEBUG] llao1.ui.app.main :: Reasoning generator finished.")
+                    # Append the query and the final steps to the shared session store once
+                    session_store.append_messages(
+                        session_id,
+                        [{"role": "user", "content": user_query}]
+                        + [
                             {
                                 "role": "assistant",
                                 "content": json.dumps(
@@ -164,10 +203,16 @@ def main():
                                     }
                                 ),
                             }
-                        )
-
-                except StopIteration:
-                    print("[DEBUG] llao1.ui.app.main :: Reasoning generator finished.")
+                            for (
+                                title,
+                                content,
+                                time,
+                                tool,
+                                tool_input,
+                                tool_result,
+                            ) in new_steps
+                        ],
+                    )
                     break
                 except Exception as e:
                     print(f"[ERROR] llao1.ui.app.main :: Error in reasoning loop: {e}")
@@ -237,6 +282,8 @@ def save_image_from_upload(image_file):
         f"[DEBUG] llao1.ui.app.save_image_from_upload :: Function called with image: {image_file.name}"
     )
 
+    from PIL import Image  # only needed when an image is uploaded
+
     try:
         with tempfile.NamedTemporaryFile(
             delete=False, suffix=os.path.splitext(image_file.name)[1]
@@ -1,5 +1,56 @@
 # LLao1/llao1/utils/config.py
+import os
 
 # Default values for LLM and reasoning
 DEFAULT_THINKING_TOKENS = 300
 DEFAULT_MODEL = "llama3.2-vision"
+
+# Model warm-up and routing
+FAST_MODEL = os.environ.get("LLAO1_FAST_MODEL", "llama3.2")  # small model for cheap steps
+OLLAMA_KEEP_ALIVE = 1800  # seconds Ollama keeps a model resident after its last request
+WARMUP_MODELS = [DEFAULT_MODEL, FAST_MODEL]  # kept loaded next to the selected model when memory allows
+MODEL_ROUTES = {  # step kind -> model; None keeps the model the user selected
+    "reasoning": None,
+    "final_answer": FAST_MODEL,
+}
+ROUTE_ONLY_WARM_MODELS = True  # never route to a model that would need a cold load
+OLLAMA_PS_CACHE_SECONDS = 5  # how long an `ollama ps` residency check is reused
+WARMUP_RETRY_SECONDS = 5  # delay before retrying a failed warm-up, doubled after each failure
+WARMUP_RETRY_MAX_SECONDS = 300  # upper bound for the warm-up retry delay
+MODEL_CONFLICT_COOLDOWN = 1800  # seconds an optional model is skipped after it evicted a required one
+
+# Local retrieval (local_search tool)
+LOCAL_DOCS_DIR = os.environ.get("LLAO1_DOCS_DIR", "")
+LOCAL_INDEX_DIR = os.environ.get(
+    "LLAO1_INDEX_DIR", os.path.join(os.path.expanduser("~"), ".llao1", "index")
+)
+LOCAL_EMBEDDING_MODEL = os.environ.get("LLAO1_EMBEDDING_MODEL", "nomic-embed-text")
+LOCAL_CHUNK_SIZE = 200  # words per chunk
+LOCAL_CHUNK_OVERLAP = 40  # words shared between consecutive chunks
+LOCAL_INDEX_EXTENSIONS = (".txt", ".md", ".rst", ".py", ".json", ".csv", ".html")
+LOCAL_INDEX_REFRESH_INTERVAL = 30  # seconds between directory re-scans
+
+# Tool output bounds
+TOOL_OUTPUT_LIMITS = {  # max UTF-8 bytes returned inline to the model per tool
+    "code_executor": 4000,
+    "web_search": 8000,
+    "fetch_page_content": 8000,
+    "local_search": 8000,
+}
+DEFAULT_TOOL_OUTPUT_LIMIT = 4000
+TOOL_OUTPUT_PAGE_SIZE = 4000  # UTF-8 bytes per page returned by read_output
+CODE_OUTPUT_HARD_LIMIT = 50 * 1024 * 1024  # bytes before a running snippet is killed
+OUTPUT_STORE_DIR = os.environ.get(
+    "LLAO1_OUTPUT_DIR", os.path.join(os.path.expanduser("~"), ".llao1", "outputs")
+)
+OUTPUT_STORE_MAX_BYTES = 512 * 1024 * 1024  # oldest spilled outputs are pruned past this
+
+# Multi-session server state
+SESSION_MAX_SESSIONS = 500  # sessions kept in memory before the least recently used is evicted
+SESSION_MAX_MESSAGES = 200  # oldest messages are dropped past this per session
+SESSION_MAX_BYTES = 256 * 1024  # oldest messages are dropped past this many UTF-8 bytes per session
+SESSION_IDLE_TIMEOUT = 3600  # seconds of inactivity before a session leaves memory
+SESSION_DB_PATH = os.environ.get("LLAO1_SESSION_DB", "")  # SQLite file; empty keeps sessions in memory only
+SESSION_DB_RETENTION = 7 * 24 * 3600  # seconds before an idle persisted session is deleted
+SESSION_PURGE_INTERVAL = 60  # seconds between sweeps for idle and expired sessions
+SANDBOX_MAX_WORKERS = 4  # code_executor subprocesses allowed to run at once per process
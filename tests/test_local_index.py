@@ -0,0 +1,170 @@
+# LLao1/tests/test_local_index.py
+import json
+import os
+import zlib
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from llao1.core import local_index
+from llao1.core.local_index import LocalIndex, chunk_text
+
+DIM = 32
+
+
+class FakeOllama:
+    """Embeds text as hashed bag-of-words vectors and records every embedded text."""
+
+    def __init__(self):
+        self.embedded = []
+        self.fail = False
+
+    def embed(self, model, input):
+        if self.fail:
+            raise ConnectionError("Ollama is not running")
+        self.embedded.extend(input)
+        vectors = []
+        for text in input:
+            vector = [0.0] * DIM
+            for token in local_index.tokenize(text):
+                vector[zlib.crc32(token.encode()) % DIM] += 1.0
+            vectors.append(vector)
+        return {"embeddings": vectors}
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    client = FakeOllama()
+    monkeypatch.setattr(local_index, "get_ollama_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def docs(tmp_path):
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    (directory / "cats.txt").write_text("cats purr and sleep in the sun " * 5)
+    (directory / "rockets.md").write_text("rockets burn fuel to reach orbit " * 5)
+    (directory / "ignored.bin").write_text("rockets rockets rockets")
+    return directory
+
+
+def make_index(tmp_path, docs):
+    return LocalIndex(str(docs), str(tmp_path / "index"), "test-embed")
+
+
+def test_chunk_text_overlaps_windows():
+    words = [f"w{i}" for i in range(10)]
+    chunks = chunk_text(" ".join(words), chunk_size=4, overlap=1)
+    assert chunks == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9"]
+    assert chunk_text("   ") == []
+
+
+def test_refresh_only_embeds_changed_files(tmp_path, docs, ollama):
+    index = make_index(tmp_path, docs)
+    assert not index.is_ready
+    assert index.refresh(force=True)
+    assert index.is_ready
+    assert sorted(index.manifest["files"]) == ["cats.txt", "rockets.md"]
+    assert len(ollama.embedded) == len(index.chunks) == 2
+
+    assert not index.refresh(force=True)
+
+    ollama.embedded.clear()
+    (docs / "cats.txt").write_text("dogs bark at the mailman")
+    (docs / "notes.txt").write_text("orbit mechanics notes")
+    assert index.refresh(force=True)
+    assert sorted(ollama.embedded) == ["dogs bark at the mailman", "orbit mechanics notes"]
+    assert [chunk["path"] for chunk in index.chunks] == ["cats.txt", "notes.txt", "rockets.md"]
+
+    rebuilt = LocalIndex(str(docs), str(tmp_path / "rebuilt"), "test-embed")
+    rebuilt.refresh(force=True)
+    assert (index._state["embeddings"] == rebuilt._state["embeddings"]).all()
+
+    (docs / "notes.txt").unlink()
+    assert index.refresh(force=True)
+    assert [chunk["path"] for chunk in index.chunks] == ["cats.txt", "rockets.md"]
+
+
+def test_touching_a_file_does_not_re_embed_it(tmp_path, docs, ollama):
+    index = make_index(tmp_path, docs)
+    index.refresh(force=True)
+    ollama.embedded.clear()
+    os.utime(docs / "cats.txt", (1, 1))
+    index.refresh(force=True)
+    assert ollama.embedded == []
+    assert index.manifest["files"]["cats.txt"]["mtime"] == 1
+
+
+def test_index_is_reloaded_from_disk(tmp_path, docs, ollama):
+    make_index(tmp_path, docs).refresh(force=True)
+    reloaded = make_index(tmp_path, docs)
+    assert reloaded.is_ready
+    assert len(reloaded.chunks) == 2
+    assert reloaded.search("orbit", top_k=1)[0]["path"] == "rockets.md"
+
+
+def test_inconsistent_generation_is_rebuilt(tmp_path, docs, ollama):
+    index = make_index(tmp_path, docs)
+    index.refresh(force=True)
+    with open(tmp_path / "index" / "manifest.json") as f:
+        generation = json.load(f)["generation"]
+    (tmp_path / "index" / generation / "chunks.jsonl").write_text("")
+
+    reloaded = make_index(tmp_path, docs)
+    assert not reloaded.is_ready
+    assert reloaded.refresh(force=True)
+    assert len(reloaded.chunks) == 2
+
+
+def test_old_generations_are_pruned(tmp_path, docs, ollama):
+    index = make_index(tmp_path, docs)
+    for text in ("one", "two", "three"):
+        (docs / "cats.txt").write_text(text)
+        index.refresh(force=True)
+    generations = [
+        name for name in os.listdir(tmp_path / "index") if name.startswith(local_index.GENERATION_PREFIX)
+    ]
+    assert len(generations) == 2
+    assert index.manifest["generation"] == max(generations)
+
+
+def test_bm25_ranks_term_matches(tmp_path, docs, ollama):
+    index = make_index(tmp_path, docs)
+    index.refresh(force=True)
+    state = index._state
+    rows = index._bm25_rank(state, "fuel orbit", 10)
+    assert [state["chunks"][row]["path"] for row in rows] == ["rockets.md"]
+    assert index._bm25_rank(state, "submarine", 10) == []
+
+
+def test_search_fuses_vector_and_keyword_rankings(tmp_path, docs, ollama):
+    index = make_index(tmp_path, docs)
+    index.refresh(force=True)
+    results = index.search("cats sleep in the sun", top_k=2)
+    assert [result["path"] for result in results] == ["cats.txt", "rockets.md"]
+    # Ranked first by both lists: 1/61 + 1/61
+    assert results[0]["score"] == pytest.approx(2 / (local_index.RRF_K + 1))
+
+
+def test_search_falls_back_to_bm25_when_embedding_fails(tmp_path, docs, ollama):
+    index = make_index(tmp_path, docs)
+    index.refresh(force=True)
+    ollama.fail = True
+    results = index.search("rockets", top_k=2)
+    assert [result["path"] for result in results] == ["rockets.md"]
+
+
+def test_keyword_only_index_when_embedding_is_unavailable(tmp_path, docs, ollama):
+    ollama.fail = True
+    index = make_index(tmp_path, docs)
+    assert index.refresh(force=True)
+    assert index.is_ready
+    assert index.manifest["dim"] is None
+    assert index.search("purr", top_k=1)[0]["path"] == "cats.txt"
+
+    ollama.fail = False
+    assert index.refresh(force=True)
+    assert index.manifest["dim"] == DIM
+    assert len(ollama.embedded) == 2
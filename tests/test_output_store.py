@@ -0,0 +1,73 @@
+# LLao1/tests/test_output_store.py
+import io
+import re
+
+import pytest
+
+from llao1.core import output_store
+from llao1.core.output_store import bound_output, bound_output_file, read_output
+
+PAGE_SIZE = 10
+LIMIT = 16
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(output_store, "OUTPUT_STORE_DIR", str(tmp_path / "outputs"))
+    monkeypatch.setattr(output_store, "TOOL_OUTPUT_PAGE_SIZE", PAGE_SIZE)
+    monkeypatch.setattr(output_store, "TOOL_OUTPUT_LIMITS", {"web_search": LIMIT})
+    monkeypatch.setattr(output_store, "DEFAULT_TOOL_OUTPUT_LIMIT", LIMIT)
+    return tmp_path / "outputs"
+
+
+def handle_of(summary: str) -> str:
+    return re.search(r"'(out_[0-9a-f]+)'", summary).group(1)
+
+
+def read_all_pages(handle: str) -> list:
+    first = read_output(handle, 1)
+    pages = int(re.match(r"\[\S+ page 1/(\d+)\]", first).group(1))
+    return [read_output(handle, page).split("\n", 1)[1] for page in range(1, pages + 1)]
+
+
+def test_output_within_limit_is_unchanged():
+    assert bound_output("web_search", "é" * (LIMIT // 2)) == "é" * (LIMIT // 2)
+
+
+def test_limit_is_measured_in_bytes():
+    summary = bound_output("web_search", "é" * (LIMIT // 2 + 1))
+    assert "output truncated: 18 bytes total" in summary
+
+
+@pytest.mark.parametrize("text", ["é" * 25, "a€" * 13, "😀b" * 9, "x" + "日本語" * 6])
+def test_pages_never_split_multibyte_characters(text):
+    summary = bound_output("web_search", text)
+    pages = read_all_pages(handle_of(summary))
+    assert "".join(pages) == text
+    assert all("�" not in page for page in pages)
+    assert all(len(page.encode("utf-8")) <= PAGE_SIZE + 3 for page in pages)
+
+
+def test_head_and_tail_are_whole_characters():
+    text = "€" * 20
+    summary = bound_output("web_search", text)
+    head, tail = summary.split("\n\n")[0], summary.split("\n\n")[-1]
+    assert "�" not in head + tail
+    assert text.startswith(head) and text.endswith(tail)
+
+
+def test_file_output_is_stored_once_per_content(store):
+    payload = ("line ü\n" * 50).encode("utf-8")
+    first = bound_output_file("code_executor", io.BytesIO(payload), prefix="Error: ")
+    second = bound_output_file("code_executor", io.BytesIO(payload))
+    assert first.startswith("Error: ")
+    assert handle_of(first) == handle_of(second)
+    assert len(list(store.rglob("*.txt"))) == 1
+
+
+def test_read_output_rejects_bad_requests():
+    handle = handle_of(bound_output("web_search", "z" * 40))
+    assert read_output("../etc/passwd").startswith("Error: Invalid output handle")
+    assert read_output("out_0000000000000000").startswith("Error: Output")
+    assert read_output(handle, 99).startswith("Error: Page 99 is out of range")
+    assert read_output(handle, "two").startswith("Error: Invalid page number")
@@ -0,0 +1,111 @@
+# LLao1/tests/test_sessions.py
+import time
+
+import pytest
+
+from llao1.core.sessions import SessionStore
+
+
+def turn(question: str, answer: str = "ok") -> list:
+    return [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    stores = []
+
+    def make(**kwargs):
+        kwargs.setdefault("db_path", "")
+        kwargs.setdefault("purge_interval", 0)
+        store = SessionStore(**kwargs)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_size_is_counted_in_utf8_bytes(make_store):
+    store = make_store()
+    store.append_messages("s", [{"role": "user", "content": "é€😀"}])
+    assert store.stats() == {"sessions": 1, "messages": 1, "bytes": len("user") + 2 + 3 + 4}
+
+
+def test_oldest_messages_are_trimmed_to_the_message_limit(make_store):
+    store = make_store(max_messages=4)
+    for number in range(3):
+        store.append_messages("s", turn(f"q{number}"))
+    assert [m["content"] for m in store.get_messages("s")] == ["q1", "ok", "q2", "ok"]
+
+
+def test_oldest_messages_are_trimmed_to_the_byte_limit(make_store):
+    store = make_store(max_bytes=30)
+    store.append_messages("s", turn("é" * 10))
+    store.append_messages("s", turn("second"))
+    assert [m["content"] for m in store.get_messages("s")] == ["second", "ok"]
+    assert store.stats()["bytes"] <= 30
+
+
+def test_oversized_turn_is_kept(make_store):
+    store = make_store(max_bytes=50)
+    store.append_messages("s", turn("small"))
+    store.append_messages("s", turn("x" * 500, "y" * 500))
+    messages = store.get_messages("s")
+    assert [m["content"][:1] for m in messages] == ["x", "y"]
+    store.append_messages("s", turn("next"))
+    assert [m["content"] for m in store.get_messages("s")] == ["next", "ok"]
+
+
+def test_least_recently_used_session_is_evicted(make_store):
+    store = make_store(max_sessions=2)
+    store.append_messages("a", turn("a"))
+    store.append_messages("b", turn("b"))
+    store.get_messages("a")
+    store.append_messages("c", turn("c"))
+    assert store.stats()["sessions"] == 2
+    assert store.get_messages("b") == []
+    assert store.get_messages("a") == []  # "b" was reloaded empty, pushing out "a"
+
+
+def test_purge_evicts_idle_sessions(make_store):
+    store = make_store(idle_timeout=0.05)
+    store.append_messages("idle", turn("q"))
+    time.sleep(0.1)
+    store.append_messages("active", turn("q"))
+    store.purge()
+    assert store.stats()["sessions"] == 1
+    assert store.get_messages("active")
+
+
+def test_purge_timer_runs_in_the_background(make_store):
+    store = make_store(idle_timeout=0.01, purge_interval=0.02)
+    store.append_messages("s", turn("q"))
+    deadline = time.time() + 2
+    while store.stats()["sessions"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert store.stats()["sessions"] == 0
+
+
+def test_sqlite_history_survives_eviction_and_restart(make_store, tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+    store = make_store(db_path=db_path, max_sessions=1)
+    store.append_messages("a", turn("remember me"))
+    store.append_messages("b", turn("other"))
+    assert store.get_messages("a")[0]["content"] == "remember me"
+    store.close()
+
+    restarted = make_store(db_path=db_path)
+    assert restarted.get_messages("a")[0]["content"] == "remember me"
+    restarted.clear("a")
+    assert make_store(db_path=db_path).get_messages("a") == []
+
+
+def test_purge_deletes_expired_rows(make_store, tmp_path, monkeypatch):
+    monkeypatch.setattr("llao1.core.sessions.SESSION_DB_RETENTION", 0.05)
+    db_path = str(tmp_path / "sessions.db")
+    store = make_store(db_path=db_path, idle_timeout=0.05)
+    store.append_messages("old", turn("q"))
+    time.sleep(0.1)
+    store.purge()
+    assert make_store(db_path=db_path).get_messages("old") == []